@@ -1,7 +1,5 @@
 import sys
 import argparse
-import h5py
-from . import AllotropeDF
 
 
 cli = argparse.ArgumentParser(
@@ -27,9 +25,18 @@ cli.add_argument(
 cli.add_argument("--output", "-o", metavar="FILE", help="Save output to FILE")
 arg = cli.parse_args()
 
+# Heavy imports (h5py, numpy, rdflib) happen only once the command line
+# is valid, so --help and usage errors stay fast.
+import h5py  # noqa: E402
+from . import AllotropeDF  # noqa: E402
+
 formats = [AllotropeDF]
 
-with h5py.File(arg.h5file, mode="r") as f:
+# A chunk cache much larger than the 1 MiB default keeps whole chunks of
+# the quads and dictionary datasets resident while they are read through.
+with h5py.File(
+    arg.h5file, mode="r", rdcc_nbytes=64 * 1024 * 1024, rdcc_nslots=1_000_003
+) as f:
     # Find a reader class for the input HDF5 file...
     for cls in formats:
         if cls.verify_format(f):
@@ -0,0 +1,160 @@
+"""Optional Numba-accelerated N-Quads formatting kernel.
+
+Numba is not a hard dependency of h5ld. When it is installed, the
+functions below are compiled to native code and ``AllotropeDF`` routes
+quad formatting through :func:`build_nquads`; otherwise the pure Python
+definitions remain importable and the reader keeps its regular path.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+HAVE_NUMBA = njit is not None
+
+# UTF-8 bytes that must be backslash-escaped in literal values, mapped to
+# the character following the backslash (0 means no escape needed).
+ESCAPE_LUT = np.zeros(256, dtype=np.uint8)
+ESCAPE_LUT[ord('"')] = ord('"')
+ESCAPE_LUT[ord("'")] = ord("'")
+ESCAPE_LUT[ord("\t")] = ord("t")
+ESCAPE_LUT[ord("\n")] = ord("n")
+ESCAPE_LUT[ord("\r")] = ord("r")
+ESCAPE_LUT[ord("\b")] = ord("b")
+ESCAPE_LUT[ord("\f")] = ord("f")
+
+_BLANK, _RESOURCE, _LITERAL = 0, 1, 2
+
+
+def _token_len(kind, res_key, val_key, offsets, sbytes, escape_lut):
+    """Formatted byte length of one RDF node token."""
+    vlen = offsets[val_key + 1] - offsets[val_key]
+    if kind == _BLANK:
+        # "_:" + value, minus a stripped leading "-".
+        if vlen > 0 and sbytes[offsets[val_key]] == 45:
+            vlen -= 1
+        return 2 + vlen
+    elif kind == _RESOURCE:
+        # "<" + resource + value + ">".
+        return 2 + vlen + offsets[res_key + 1] - offsets[res_key]
+    else:
+        # '"' + escaped value + '"' and an optional "^^<" + resource + ">".
+        n = 2
+        for b in range(offsets[val_key], offsets[val_key + 1]):
+            n += 2 if escape_lut[sbytes[b]] else 1
+        if res_key != 0:
+            n += 4 + offsets[res_key + 1] - offsets[res_key]
+        return n
+
+
+def _emit_token(out, pos, kind, res_key, val_key, offsets, sbytes, escape_lut):
+    """Write one RDF node token into out at pos; return the new position."""
+    if kind == _BLANK:
+        out[pos] = 95  # _
+        out[pos + 1] = 58  # :
+        pos += 2
+        start = offsets[val_key]
+        if start < offsets[val_key + 1] and sbytes[start] == 45:
+            start += 1
+        for b in range(start, offsets[val_key + 1]):
+            out[pos] = sbytes[b]
+            pos += 1
+    elif kind == _RESOURCE:
+        out[pos] = 60  # <
+        pos += 1
+        for b in range(offsets[res_key], offsets[res_key + 1]):
+            out[pos] = sbytes[b]
+            pos += 1
+        for b in range(offsets[val_key], offsets[val_key + 1]):
+            out[pos] = sbytes[b]
+            pos += 1
+        out[pos] = 62  # >
+        pos += 1
+    else:
+        out[pos] = 34  # "
+        pos += 1
+        for b in range(offsets[val_key], offsets[val_key + 1]):
+            esc = escape_lut[sbytes[b]]
+            if esc:
+                out[pos] = 92  # backslash
+                out[pos + 1] = esc
+                pos += 2
+            else:
+                out[pos] = sbytes[b]
+                pos += 1
+        out[pos] = 34  # "
+        pos += 1
+        if res_key != 0:
+            out[pos] = 94  # ^
+            out[pos + 1] = 94  # ^
+            out[pos + 2] = 60  # <
+            pos += 3
+            for b in range(offsets[res_key], offsets[res_key + 1]):
+                out[pos] = sbytes[b]
+                pos += 1
+            out[pos] = 62  # >
+            pos += 1
+    return pos
+
+
+def build_nquads(node_kind, node_key, node_value_key, offsets, sbytes, escape_lut):
+    """Format decoded quads as one N-Quads uint8 buffer.
+
+    The first column of each row is the graph node; it is emitted last,
+    matching ``<s> <p> <o> <g> .`` line order.
+    """
+    num_quads, num_nodes = node_kind.shape
+    row_len = np.empty(num_quads, dtype=np.int64)
+    for row in prange(num_quads):
+        n = 6  # three separating spaces plus " .\n"
+        for i in range(num_nodes):
+            n += _token_len(
+                node_kind[row, i],
+                node_key[row, i],
+                node_value_key[row, i],
+                offsets,
+                sbytes,
+                escape_lut,
+            )
+        row_len[row] = n
+
+    row_end = np.cumsum(row_len)
+    out = np.empty(row_end[-1] if num_quads else 0, dtype=np.uint8)
+    for row in prange(num_quads):
+        pos = row_end[row] - row_len[row]
+        for i in range(1, num_nodes):
+            pos = _emit_token(
+                out,
+                pos,
+                node_kind[row, i],
+                node_key[row, i],
+                node_value_key[row, i],
+                offsets,
+                sbytes,
+                escape_lut,
+            )
+            out[pos] = 32  # space
+            pos += 1
+        pos = _emit_token(
+            out,
+            pos,
+            node_kind[row, 0],
+            node_key[row, 0],
+            node_value_key[row, 0],
+            offsets,
+            sbytes,
+            escape_lut,
+        )
+        out[pos] = 32  # space
+        out[pos + 1] = 46  # .
+        out[pos + 2] = 10  # newline
+    return out
+
+
+if HAVE_NUMBA:
+    _token_len = njit(cache=True)(_token_len)
+    _emit_token = njit(cache=True)(_emit_token)
+    build_nquads = njit(cache=True, parallel=True)(build_nquads)
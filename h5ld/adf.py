@@ -2,8 +2,58 @@ import typing
 import io
 import numpy as np
 import h5py
-from rdflib import ConjunctiveGraph
-from rdflib.namespace import NamespaceManager
+
+try:
+    import pyoxigraph
+except ImportError:
+    pyoxigraph = None
+
+from . import _kernel
+
+if typing.TYPE_CHECKING:
+    from rdflib import ConjunctiveGraph
+
+_NAMESPACES = {
+    "hdf5": "http://purl.allotrope.org/ontologies/hdf5/1.8#",
+    "afs-hdf5": "http://purl.allotrope.org/shapes/hdf#",
+    "adf-dc-hdf5": "http://purl.allotrope.org/ontologies/datacube-hdf-map#",
+    "adf-dp": "http://purl.allotrope.org/ontologies/datapackage#",
+    "adf-dd": "http://purl.allotrope.org/ontologies/datadescription#",
+    "adf-dc": "http://purl.allotrope.org/ontologies/datacube#",
+    "af-sh": "http://purl.allotrope.org/ontologies/shapes/",
+    "af-c": "http://purl.allotrope.org/ontologies/common#",
+    "af-e": "http://purl.allotrope.org/ontologies/equipment#",
+    "af-m": "http://purl.allotrope.org/ontologies/material#",
+    "af-p": "http://purl.allotrope.org/ontologies/process#",
+    "af-q": "http://purl.allotrope.org/ontologies/quality#",
+    "af-r": "http://purl.allotrope.org/ontologies/result#",
+    "af-s": "http://purl.allotrope.org/shape/",
+    "af-x": "http://purl.allotrope.org/ontologies/property#",
+    "af-a": "http://purl.allotrope.org/ontologies/audit#",
+    "sh": "http://www.w3.org/ns/shacl#",
+    "qb": "http://purl.org/linked-data/cube#",
+    "qudt": "http://qudt.org/schema/qudt#",
+    "qudt-unit": "http://qudt.org/vocab/unit#",
+    "qudt-quantity": "http://qudt.org/vocab/quantity#",
+    "dct": "http://purl.org/dc/terms/",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "pav": "http://purl.org/pav/",
+    "obo": "http://purl.obolibrary.org/obo/",
+}
+
+_LITERAL_ESCAPE = str.maketrans(
+    {
+        '"': r"\"",
+        "'": r"\'",
+        "\t": r"\t",
+        "\n": r"\n",
+        "\r": r"\r",
+        "\b": r"\b",
+        "\f": r"\f",
+    }
+)
 
 
 class AllotropeDF:
@@ -15,173 +65,241 @@ class AllotropeDF:
     @staticmethod
     def verify_format(f: h5py.File) -> bool:
         """Check if the HDF5 file is an ADF file."""
-        try:
-            # f.attrs['adf-file-id']
-            f.attrs["adf-lib-version"]
-            f.attrs["adf-version"]
-            return True
-        except Exception:
-            return False
+        # f.attrs['adf-file-id']
+        attrs = f.attrs
+        return "adf-lib-version" in attrs and "adf-version" in attrs
 
     @staticmethod
     def check_ld(f: h5py.File, report: bool = False) -> bool:
         """Check if ADF file has useable data description content."""
-        try:
-            quads = f["/data-description/quads"]
-            assert quads.dtype.name == "int64"
-            assert len(quads.shape) == 2
-            assert quads.shape[1] == 5
-            f["/data-description/dictionary/keys"]
-            f["/data-description/dictionary/bytes"]
-            if report:
-                print(f'Number of RDF quads: {quads.attrs["size"]}')
-            return True
-        except Exception:
+        quads = f.get("/data-description/quads")
+        if not isinstance(quads, h5py.Dataset):
+            return False
+        if quads.dtype.name != "int64" or len(quads.shape) != 2 or quads.shape[1] != 5:
             return False
+        if f.get("/data-description/dictionary/keys") is None:
+            return False
+        if f.get("/data-description/dictionary/bytes") is None:
+            return False
+        if report:
+            print(f'Number of RDF quads: {quads.attrs["size"]}')
+        return True
 
     def __init__(self, f: h5py.File) -> None:
         self._h5f = f
 
-    def _get_string(self, key: np.int64) -> str:
-        value = self.key_store[key, :]
-        if value[-1] > 0:
-            return value[: value[-1]].tobytes().decode("utf-8")
-        else:
-            start = np.frombuffer(value[:8], dtype=">i8")[0]
-            count = np.frombuffer(value[8:-1], dtype=">i4")[0]
-            return self.str_store[start : start + count].decode("utf-8")  # noqa: E203
+    def _decode_all_keys(self) -> None:
+        """Decode every dictionary key into ``self._strings`` in one pass."""
+        # Reinterpret the fixed 12-byte big-blob prefix of every key row in
+        # one shot instead of two np.frombuffer calls per key.
+        prefix = np.ascontiguousarray(self.key_store[:, :12]).view(
+            np.dtype([("start", ">i8"), ("count", ">i4")])
+        )
+        starts = prefix["start"].ravel()
+        counts = prefix["count"].ravel()
+        strings: typing.List[str] = [""] * self.key_store.shape[0]
+        inline_keys = list()
+        inline_parts = list()
+        for key, value in enumerate(self.key_store):
+            if value[-1] > 0:
+                inline_keys.append(key)
+                inline_parts.append(value[: value[-1]].tobytes())
+            else:
+                start = starts[key]
+                strings[key] = bytes(
+                    self.str_store[start : start + counts[key]]  # noqa: E203
+                ).decode("utf-8")
+        # One codec invocation covers all inline keys: join on a NUL
+        # sentinel, which cannot occur in the dictionary's key text, decode
+        # the lot, and split the result back apart.
+        if inline_parts:
+            decoded = b"\x00".join(inline_parts).decode("utf-8").split("\x00")
+            for key, string in zip(inline_keys, decoded):
+                strings[key] = string
+        self._strings = strings
+
+    def _flat_strings(self) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Encode decoded key strings into one flat uint8 buffer plus offsets."""
+        encoded = [s.encode("utf-8") for s in self._strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
 
     def _resource_node(self, res_key: np.int64, val_key: np.int64) -> str:
         """Form an IRI RDF node string."""
-        val = self._get_string(val_key)
-        res = self._get_string(res_key)
+        val = self._strings[val_key]
+        res = self._strings[res_key]
         return f"<{res}{val}>"
 
     def _literal_node(self, res_key: np.int64, val_key: np.int64) -> str:
         """Form a literal RDF node string."""
-        val = self._get_string(val_key)
-        val = (
-            val.replace('"', r"\"")
-            .replace("'", r"\'")
-            .replace("\t", r"\t")
-            .replace("\n", r"\n")
-            .replace("\r", r"\r")
-            .replace("\b", r"\b")
-            .replace("\f", r"\f")
-        )
+        val = self._strings[val_key].translate(_LITERAL_ESCAPE)
         if res_key == 0:
             # This is an assumption to be validated...
             return f'"{val}"'
         else:
-            res = self._get_string(res_key)
+            res = self._strings[res_key]
             return f'"{val}"^^<{res}>'
 
     def _blank_node(self, res_key: np.int64, val_key: np.int64) -> str:
         """Form a blank RDF node string."""
-        val = self._get_string(val_key)
+        val = self._strings[val_key]
         if val[0] == "-":
             val = val[1:]
         return f"_:{val}"
 
-    def _get_quads(self, store: io.TextIOWrapper) -> None:
-        """Read quads from the ADF file."""
-        quads = self._h5f["/data-description/quads"]
-        num_quads = quads.shape[0]
-        num_good_quads = quads.attrs["size"]
-        quads = quads[...]
+    def _get_quads(self, store: typing.BinaryIO) -> None:
+        """Read quads from the ADF file and write them to store as N-Quads."""
+        quads_ds = self._h5f["/data-description/quads"]
+        num_good_quads = int(quads_ds.attrs["size"])
+        # Only the first `size` rows can be needed unless some of them are
+        # tombstoned, so skip transferring padded trailing rows up front.
+        num_rows = min(quads_ds.shape[0], num_good_quads)
+        quads = np.empty((num_rows,) + quads_ds.shape[1:], dtype=quads_ds.dtype)
+        quads_ds.read_direct(quads, source_sel=np.s_[:num_rows])
         quads = quads[quads[:, -1] == 0, :-1]
-        self.key_store = self._h5f["/data-description/dictionary/keys"][...]
-        self.str_store = self._h5f["/data-description/dictionary/bytes"][...].tobytes()
+        if quads.shape[0] < num_good_quads and quads_ds.shape[0] > num_rows:
+            # Deleted rows displaced some live quads past the first `size`
+            # rows; fetch the remainder and filter it the same way.
+            rest = quads_ds[num_rows:]
+            rest = rest[rest[:, -1] == 0, :-1]
+            quads = np.concatenate((quads, rest))
+        quads = quads[:num_good_quads, :]
+        keys_ds = self._h5f["/data-description/dictionary/keys"]
+        self.key_store = np.empty(keys_ds.shape, dtype=keys_ds.dtype)
+        keys_ds.read_direct(self.key_store)
+        bytes_ds = self._h5f["/data-description/dictionary/bytes"]
+        str_store = np.empty(bytes_ds.shape, dtype=bytes_ds.dtype)
+        bytes_ds.read_direct(str_store)
+        self.str_store = memoryview(str_store).cast("B")
+        self._decode_all_keys()
 
         node_id_31bit_mask = 0x7FFFFFFF
-        template = [self._blank_node, self._resource_node, self._literal_node]
-
-        for qrow in range(num_quads):
-            if qrow >= num_good_quads:
-                break
+        # Keep the decoded fields as narrow structure-of-arrays types; the
+        # keys fit in 31 bits and the kind in 2, so int64 is wasted width.
+        node_value_key = np.bitwise_and(quads, node_id_31bit_mask).astype(np.int32)
+        # One shared temporary for both upper fields; never shift in place
+        # over the source array, which would corrupt later extractions.
+        shifted = np.right_shift(quads, 31)
+        node_key = np.bitwise_and(shifted, node_id_31bit_mask).astype(np.int32)
+        node_kind = np.bitwise_and(np.right_shift(shifted, 31), 3).astype(np.uint8)
+        del quads, shifted
+        if _kernel.HAVE_NUMBA:
+            offsets, sbytes = self._flat_strings()
+            out = _kernel.build_nquads(
+                node_kind, node_key, node_value_key, offsets, sbytes,
+                _kernel.ESCAPE_LUT,
+            )
+            store.write(out.tobytes())
+            return
 
-            quad_content = list()
-            quad = quads[qrow, :]
+        # RDF vocabularies repeat heavily (predicates, datatypes, graph
+        # names), so format each distinct node once and gather by index.
+        nodes = np.stack([node_kind, node_key, node_value_key], axis=-1)
+        unique_nodes, inverse = np.unique(
+            nodes.reshape(-1, 3), axis=0, return_inverse=True
+        )
+        kinds = unique_nodes[:, 0]
+        res_keys = unique_nodes[:, 1]
+        val_keys = unique_nodes[:, 2]
+        strings = np.array(self._strings, dtype=object)
+        tokens = np.empty(unique_nodes.shape[0], dtype=object)
+        # IRI nodes dominate; build them all with one broadcast concatenation
+        # instead of per-node f-string calls.
+        is_res = kinds == 1
+        tokens[is_res] = (
+            "<" + strings[res_keys[is_res]] + strings[val_keys[is_res]] + ">"
+        )
+        # Literals split into two branch-free passes: plain ones and those
+        # carrying a datatype IRI.
+        is_lit = kinds == 2
+        plain = is_lit & (res_keys == 0)
+        typed = is_lit & (res_keys != 0)
 
-            node_value_key = np.bitwise_and(quad, node_id_31bit_mask)
-            node_key = np.bitwise_and(
-                np.right_shift(quad, 31, out=quad), node_id_31bit_mask
+        def escaped(keys: np.ndarray) -> np.ndarray:
+            return np.array(
+                [strings[k].translate(_LITERAL_ESCAPE) for k in keys], dtype=object
             )
-            node_kind = np.bitwise_and(np.right_shift(quad, 31), 3)
 
-            for i in range(node_kind.size):
-                quad_content.append(
-                    template[node_kind[i]](
-                        res_key=node_key[i], val_key=node_value_key[i]
-                    )
-                )
-            store.write(" ".join(quad_content[1:]) + f" {quad_content[0]}" + " .\n")
+        tokens[plain] = '"' + escaped(val_keys[plain]) + '"'
+        tokens[typed] = (
+            '"' + escaped(val_keys[typed]) + '"^^<' + strings[res_keys[typed]] + ">"
+        )
+        for i in np.nonzero(kinds == 0)[0]:
+            tokens[i] = self._blank_node(res_key=res_keys[i], val_key=val_keys[i])
+        inverse = inverse.reshape(node_kind.shape)
+
+        # Join and encode in bounded batches to keep one C-level UTF-8
+        # encode per batch without holding two copies of the full output.
+        batch_size = 65536
+        lines = list()
+        for qrow in range(node_kind.shape[0]):
+            quad_content = [
+                tokens[inverse[qrow, i]] for i in range(node_kind.shape[1])
+            ]
+            lines.append(" ".join(quad_content[1:]) + f" {quad_content[0]}" + " .\n")
+            if len(lines) == batch_size:
+                store.write("".join(lines).encode("utf-8"))
+                lines.clear()
+        if lines:
+            store.write("".join(lines).encode("utf-8"))
 
     def dump_ld(
         self,
         destination: typing.Optional[typing.Union[str, io.BytesIO]] = None,
         format: typing.Optional[str] = None,
-    ) -> typing.Optional[ConjunctiveGraph]:
+    ) -> typing.Optional["ConjunctiveGraph"]:
         """Dump ADF Data Description content to destination in requested format."""
         buf = io.BytesIO()
-        store = io.TextIOWrapper(buf, encoding="utf-8")
-        self._get_quads(store)
-        store.flush()
+        self._get_quads(buf)
         buf.seek(0, io.SEEK_SET)
+        if destination and format == "nquads":
+            # Raw N-Quads are passed through as-is; no need for a graph.
+            if isinstance(destination, str):
+                with open(destination, mode="wb") as dest:
+                    dest.write(buf.getbuffer())
+            else:
+                destination.write(buf.getbuffer())
+            return None
+        if destination and pyoxigraph is not None and format in ("turtle", "trig"):
+            # pyoxigraph parses and serializes in native code, much faster
+            # than rdflib's pure-Python N-Quads parser.
+            quads = pyoxigraph.parse(buf, pyoxigraph.RdfFormat.N_QUADS)
+            if format == "turtle":
+                # Turtle has no named graphs; merge contexts like rdflib does.
+                quads = (quad.triple for quad in quads)
+                ox_format = pyoxigraph.RdfFormat.TURTLE
+            else:
+                ox_format = pyoxigraph.RdfFormat.TRIG
+            pyoxigraph.serialize(
+                quads, output=destination, format=ox_format, prefixes=self.namespaces
+            )
+            return None
+        # rdflib is imported only on the paths that build a graph, keeping
+        # its sizeable import cost off the raw n-quads dumps.
+        from rdflib import ConjunctiveGraph
+        from rdflib.namespace import NamespaceManager
+
         g = ConjunctiveGraph()
         nsmgr = NamespaceManager(g)
         for pre, iri in self.namespaces.items():
             nsmgr.bind(pre, iri)
+        g.parse(source=buf, format="nquads")
         if destination:
-            if format == "nquads":
-                if isinstance(destination, str):
-                    destination = open(destination, mode="wb")
-                destination.write(buf.getvalue())
+            if format == "json-ld":
+                g.serialize(
+                    destination=destination, format=format, context=self.namespaces
+                )
             else:
-                g.parse(source=buf, format="nquads")
-                if format == "json-ld":
-                    g.serialize(
-                        destination=destination, format=format, context=self.namespaces
-                    )
-                else:
-                    g.serialize(destination=destination, format=format)
+                g.serialize(destination=destination, format=format)
         else:
-            g.parse(source=buf, format="nquads")
             return g
 
-    def get_ld(self) -> ConjunctiveGraph:
+    def get_ld(self) -> "ConjunctiveGraph":
         """Get ADF data description content as an rdflib.ConjunctiveGraph object."""
         return self.dump_ld(destination=None)
 
     @property
     def namespaces(self) -> dict[str, str]:
         """ADF namespace prefixes."""
-        return {
-            "hdf5": "http://purl.allotrope.org/ontologies/hdf5/1.8#",
-            "afs-hdf5": "http://purl.allotrope.org/shapes/hdf#",
-            "adf-dc-hdf5": "http://purl.allotrope.org/ontologies/datacube-hdf-map#",
-            "adf-dp": "http://purl.allotrope.org/ontologies/datapackage#",
-            "adf-dd": "http://purl.allotrope.org/ontologies/datadescription#",
-            "adf-dc": "http://purl.allotrope.org/ontologies/datacube#",
-            "af-sh": "http://purl.allotrope.org/ontologies/shapes/",
-            "af-c": "http://purl.allotrope.org/ontologies/common#",
-            "af-e": "http://purl.allotrope.org/ontologies/equipment#",
-            "af-m": "http://purl.allotrope.org/ontologies/material#",
-            "af-p": "http://purl.allotrope.org/ontologies/process#",
-            "af-q": "http://purl.allotrope.org/ontologies/quality#",
-            "af-r": "http://purl.allotrope.org/ontologies/result#",
-            "af-s": "http://purl.allotrope.org/shape/",
-            "af-x": "http://purl.allotrope.org/ontologies/property#",
-            "af-a": "http://purl.allotrope.org/ontologies/audit#",
-            "sh": "http://www.w3.org/ns/shacl#",
-            "qb": "http://purl.org/linked-data/cube#",
-            "qudt": "http://qudt.org/schema/qudt#",
-            "qudt-unit": "http://qudt.org/vocab/unit#",
-            "qudt-quantity": "http://qudt.org/vocab/quantity#",
-            "dct": "http://purl.org/dc/terms/",
-            "skos": "http://www.w3.org/2004/02/skos/core#",
-            "owl": "http://www.w3.org/2002/07/owl#",
-            "xsd": "http://www.w3.org/2001/XMLSchema#",
-            "pav": "http://purl.org/pav/",
-            "obo": "http://purl.obolibrary.org/obo/",
-        }
+        return _NAMESPACES